@@ -4,16 +4,97 @@ Generates and streams IoT sensor data to S3 with device partitioning
 """
 
 import boto3
+from botocore.config import Config
+import hashlib
 import json
+import os
+import shutil
 from datetime import datetime, timedelta
 import time
 import random
 import uuid
 
+class DedupIndex:
+    """Local index of uploaded batch digests, one append-only file per date and device
+    
+    Layout: <index_dir>/<YYYY-MM-DD>/<device_id>.txt with one digest per line.
+    Eviction deletes whole date directories, so each save costs O(new digests)
+    and loading costs O(retention window).
+    """
+    
+    def __init__(self, index_dir: str = '.iot_dedup_index', retention_days: int = 7):
+        self.index_dir = index_dir
+        self.retention_days = retention_days
+        self.partitions = {}
+        self.pending = {}
+        self.evict()
+        self._load()
+    
+    def _cutoff(self, now: datetime = None) -> str:
+        return ((now or datetime.now()) - timedelta(days=self.retention_days)).strftime('%Y-%m-%d')
+    
+    def _load(self):
+        """Load partitions within the retention window (unreadable files are ignored)"""
+        cutoff = self._cutoff()
+        try:
+            dates = [d for d in os.listdir(self.index_dir) if d >= cutoff]
+        except OSError:
+            return
+        for date in dates:
+            try:
+                files = os.listdir(os.path.join(self.index_dir, date))
+            except OSError:
+                continue
+            for file_name in files:
+                if not file_name.endswith('.txt'):
+                    continue
+                try:
+                    with open(os.path.join(self.index_dir, date, file_name)) as f:
+                        digests = {line.strip() for line in f if line.strip()}
+                except (OSError, UnicodeDecodeError):
+                    continue
+                self.partitions[(date, file_name[:-4])] = digests
+    
+    def save(self):
+        """Append new digests to their partition files; failures are reported, not raised"""
+        for (date, device_id), digests in list(self.pending.items()):
+            try:
+                os.makedirs(os.path.join(self.index_dir, date), exist_ok=True)
+                with open(os.path.join(self.index_dir, date, f"{device_id}.txt"), 'a') as f:
+                    f.writelines(f"{digest}\n" for digest in digests)
+                del self.pending[(date, device_id)]
+            except OSError as e:
+                print(f"⚠ Could not persist dedup index for {date}/{device_id}: {e}")
+    
+    def evict(self, now: datetime = None):
+        """Drop partitions whose date is older than the retention window"""
+        cutoff = self._cutoff(now)
+        for key in [key for key in self.partitions if key[0] < cutoff]:
+            del self.partitions[key]
+            self.pending.pop(key, None)
+        try:
+            expired = [d for d in os.listdir(self.index_dir) if d < cutoff]
+        except OSError:
+            return
+        for date in expired:
+            shutil.rmtree(os.path.join(self.index_dir, date), ignore_errors=True)
+    
+    def contains(self, date: str, device_id: str, digest: str) -> bool:
+        return digest in self.partitions.get((date, device_id), ())
+    
+    def add(self, date: str, device_id: str, digest: str):
+        self.partitions.setdefault((date, device_id), set()).add(digest)
+        self.pending.setdefault((date, device_id), []).append(digest)
+
 class IoTDataStreamer:
-    def __init__(self, bucket_name: str = 'modern-lakehouse-data'):
-        self.s3_client = boto3.client('s3')
+    def __init__(self, bucket_name: str = 'modern-lakehouse-data', max_retries: int = 3,
+                 dedup_index: DedupIndex = None):
+        # SDK retries reuse the same content-addressed key, so they never duplicate data
+        self.s3_client = boto3.client(
+            's3', config=Config(retries={'mode': 'standard', 'max_attempts': max_retries})
+        )
         self.bucket_name = bucket_name
+        self.dedup_index = dedup_index or DedupIndex()
         self.devices = self._initialize_devices()
     
     def _initialize_devices(self) -> list:
@@ -41,46 +122,62 @@ class IoTDataStreamer:
         
         return reading
     
+    def upload_batch(self, device: dict, readings: list):
+        """Upload a batch of readings under a content-addressed key, skipping replays"""
+        if not readings:
+            print(f"↷ Skipped empty IoT batch for {device['device_id']}")
+            return None
+        
+        # Write JSONL format (one JSON object per line)
+        content = "\n".join([json.dumps(reading, sort_keys=True) for reading in readings])
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:32]
+        
+        # Partition by the data's own date so a replay on a later day maps to the same key
+        batch_date = datetime.fromisoformat(readings[0]['timestamp'])
+        partition = (batch_date.strftime('%Y-%m-%d'), device['device_id'])
+        if self.dedup_index.contains(*partition, digest):
+            print(f"↷ Skipped duplicate IoT batch for {device['device_id']}: {digest}")
+            return None
+        
+        # Create partition path with a content-addressed file name
+        s3_key = (
+            f"data/iot_data/"
+            f"device_id={device['device_id']}/"
+            f"year={batch_date.year}/"
+            f"month={batch_date.month:02d}/"
+            f"day={batch_date.day:02d}/"
+            f"readings_{digest}.jsonl"
+        )
+        
+        # Upload to S3
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=s3_key,
+            Body=content.encode('utf-8'),
+            ContentType='application/x-ndjson',
+            Metadata={
+                'device_id': device['device_id'],
+                'batch_size': str(len(readings)),
+                'generated_at': datetime.now().isoformat(),
+                'content_sha256': digest
+            }
+        )
+        self.dedup_index.add(*partition, digest)
+        
+        print(f"✓ Streamed IoT batch for {device['device_id']}: {s3_key}")
+        return s3_key
+    
     def stream_iot_batch(self, batch_size: int = 10):
         """Stream a batch of IoT readings to S3"""
         try:
             for device in self.devices:
-                readings = []
-                now = datetime.now()
-                
                 # Generate batch of readings
-                for _ in range(batch_size):
-                    reading = self.generate_sensor_reading(device)
-                    readings.append(reading)
-                
-                # Create partition path
-                s3_key = (
-                    f"data/iot_data/"
-                    f"device_id={device['device_id']}/"
-                    f"year={now.year}/"
-                    f"month={now.month:02d}/"
-                    f"day={now.day:02d}/"
-                    f"readings_{now.strftime('%H%M%S')}_{uuid.uuid4().hex[:8]}.jsonl"
-                )
-                
-                # Write JSONL format (one JSON object per line)
-                content = "\n".join([json.dumps(reading) for reading in readings])
-                
-                # Upload to S3
-                self.s3_client.put_object(
-                    Bucket=self.bucket_name,
-                    Key=s3_key,
-                    Body=content.encode('utf-8'),
-                    ContentType='application/x-ndjson',
-                    Metadata={
-                        'device_id': device['device_id'],
-                        'batch_size': str(batch_size),
-                        'generated_at': now.isoformat()
-                    }
-                )
-                
-                print(f"✓ Streamed IoT batch for {device['device_id']}: {s3_key}")
+                readings = [self.generate_sensor_reading(device) for _ in range(batch_size)]
+                self.upload_batch(device, readings)
             
+            # Persist once per batch rather than once per device upload
+            self.dedup_index.evict()
+            self.dedup_index.save()
             return True
             
         except Exception as e: